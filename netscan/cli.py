@@ -1,21 +1,29 @@
 #!/usr/bin/env python3
 
 from netscan import __version__
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from array import array
 import argparse
+import asyncio
 import socket
 import ipaddress
+import itertools
 from rich.console import Console
 from rich.table import Table
 from rich.progress import Progress
 import logging
 import csv
+import errno
+import functools
 import json
 import sys
 import os
-import threading
+import queue
 import subprocess
+import threading
 import platform
+import random
+import struct
 import time
 from contextlib import nullcontext
 
@@ -26,6 +34,10 @@ logging.basicConfig(
 
 console = Console()
 
+_IS_WINDOWS = platform.system().lower() == "windows"
+_PING_COUNT_FLAG = "-n" if _IS_WINDOWS else "-c"
+_PING_TIMEOUT_FLAG = "-w" if _IS_WINDOWS else "-W"
+
 COMMON_PORTS = {
     21: "FTP",
     22: "SSH",
@@ -52,26 +64,61 @@ COMMON_PORTS = {
     25565: "Minecraft Server",
 }
 
+# Reverse DNS lookups get their own pool so slow PTR answers never hold scan workers
+RESOLVER_WORKERS = 32
+
+# Forward lookups of the network argument: name -> (ip, monotonic resolve time)
+_forward_cache = {}
+
+# Upper bound on sockets connecting at once, kept below common descriptor limits
+MAX_IN_FLIGHT = 2048
+
+# Linux and the BSDs can create sockets non-blocking, saving a syscall per probe
+SOCK_NONBLOCK = getattr(socket, "SOCK_NONBLOCK", 0)
+
+# Above this many rows the results table is replaced by plain tab-separated output
+PLAIN_OUTPUT_THRESHOLD = 5000
+
+# Completed work is drained and reported in batches at this interval (seconds)
+PROGRESS_INTERVAL = 0.1
+
+# Streamed CSV output is written through a large buffer by a background thread
+CSV_BUFFER_SIZE = 1 << 20
+
+# At most this many submissions per worker are queued ahead of completion
+SUBMIT_WINDOW_FACTOR = 4
+# Scans with up to this many ports keep each host's mask in a 64-bit array slot
+MASK_BITS = 64
+
+# Port lists longer than this keep using the generic scan_host loop
+SPECIALIZE_MAX_PORTS = 256
+
+# Raw sweeps hand control to the event loop every this many sends so replies
+# are drained before they overflow the socket receive buffer
+SWEEP_YIELD_EVERY = 16
+
+# Receive buffer requested for sweep sockets (the kernel may cap it lower)
+SWEEP_RCVBUF = 4 << 20
+
+# At most this many echo requests are awaiting a reply or their timeout
+PING_WINDOW = 1024
+
+ICMP_ECHO_REQUEST = 8
+ICMP_ECHO_REPLY = 0
+
+TCP_SYN = 0x02
+TCP_RST = 0x04
+TCP_ACK = 0x10
+
 
 def ping_host(ip, timeout=1):
     """Ping a host once using the system ping command. Returns True if host replies."""
-    param = "-n" if platform.system().lower() == "windows" else "-c"
-    timeout_param = "-w" if platform.system().lower() == "windows" else "-W"
+    # Windows ping takes its timeout in milliseconds, other platforms in seconds
+    wait_arg = str(int(timeout * 1000)) if _IS_WINDOWS else str(int(timeout))
 
     try:
         result = subprocess.run(
-            [
-                "ping",
-                param,
-                "1",
-                timeout_param,
-                (
-                    str(int(timeout * 1000))
-                    if platform.system().lower() == "windows"
-                    else str(int(timeout))
-                ),
-                ip,
-            ],
+            ["ping", _PING_COUNT_FLAG, "1", _PING_TIMEOUT_FLAG, wait_arg, ip],
             stdout=subprocess.DEVNULL,
             stderr=subprocess.DEVNULL,
             timeout=timeout + 1,  # subprocess-level safety timeout
@@ -81,19 +128,492 @@ def ping_host(ip, timeout=1):
         return False
 
 
-def scan_host(ip, ports=None, timeout=0.01):
-    """Scan a given IP for a list of ports or a single port."""
-    thread_name = threading.current_thread().name
-    logging.debug(f"[{thread_name}] Scanning {ip} on ports {ports}")
-    results = []
-    for port in ports:
+def internet_checksum(data):
+    """Compute the RFC 1071 internet checksum of a packet."""
+    if len(data) % 2:
+        data += b"\x00"
+    total = sum(struct.unpack(f"!{len(data) // 2}H", data))
+    total = (total >> 16) + (total & 0xFFFF)
+    total += total >> 16
+    return ~total & 0xFFFF
+
+
+def build_echo_request(ident, seq, payload=b"netscan"):
+    """Build an ICMP echo request packet with a valid checksum."""
+    header = struct.pack("!BBHHH", ICMP_ECHO_REQUEST, 0, 0, ident, seq)
+    checksum = internet_checksum(header + payload)
+    return (
+        struct.pack("!BBHHH", ICMP_ECHO_REQUEST, 0, checksum, ident, seq) + payload
+    )
+
+
+def open_icmp_socket():
+    """
+    Open a non-blocking ICMP socket.
+    Unprivileged datagram ping sockets are preferred, raw sockets are the fallback.
+    Returns (sock, is_raw); raises OSError if neither can be opened.
+    """
+    error = OSError("ICMP sockets are not available")
+    for sock_type in (socket.SOCK_DGRAM, socket.SOCK_RAW):
+        try:
+            sock = socket.socket(socket.AF_INET, sock_type, socket.IPPROTO_ICMP)
+        except OSError as exc:
+            error = exc
+            continue
+        sock.setblocking(False)
+        return sock, sock_type == socket.SOCK_RAW
+    raise error
+
+
+async def _sendto(loop, sock, data, address):
+    """Send a datagram on a non-blocking socket, waiting while the buffer is full."""
+    while True:
         try:
-            logging.debug(f"Scanning IP {ip}, Port {port}")
-            with socket.create_connection((str(ip), port), timeout=timeout):
-                results.append((port, True))
-        except (socket.timeout, ConnectionRefusedError, OSError):
-            results.append((port, False))
-    return results
+            return sock.sendto(data, address)
+        except (BlockingIOError, InterruptedError):
+            writable = loop.create_future()
+            loop.add_writer(sock.fileno(), writable.set_result, None)
+            try:
+                await writable
+            finally:
+                loop.remove_writer(sock.fileno())
+
+
+def _grow_receive_buffer(sock):
+    """Ask for a SWEEP_RCVBUF receive buffer, keeping the default if refused."""
+    try:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, SWEEP_RCVBUF)
+    except OSError as exc:
+        logging.debug(f"Could not enlarge receive buffer: {exc}")
+
+
+async def _sweep(ip_list, timeout):
+    """
+    Send one echo request per IPv4 address and wait for replies on one socket.
+    At most PING_WINDOW requests are outstanding; each waits up to timeout
+    from its own send.
+    """
+    loop = asyncio.get_running_loop()
+    sock, is_raw = open_icmp_socket()
+    _grow_receive_buffer(sock)
+    ident = os.getpid() & 0xFFFF
+    replies = {}
+    waiters = {}
+    window = asyncio.Semaphore(PING_WINDOW)
+
+    def on_readable():
+        while True:
+            try:
+                packet, address = sock.recvfrom(1024)
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError as exc:
+                logging.debug(f"ICMP receive error: {exc}")
+                return
+            if is_raw:
+                # Raw sockets deliver the IP header as well
+                packet = packet[(packet[0] & 0x0F) * 4 :]
+            if len(packet) < 8:
+                continue
+            icmp_type, _, _, reply_ident, seq = struct.unpack("!BBHHH", packet[:8])
+            # Datagram ping sockets rewrite the identifier and filter replies
+            if icmp_type != ICMP_ECHO_REPLY or (is_raw and reply_ident != ident):
+                continue
+            waiter = waiters.get((address[0], seq))
+            if waiter is not None and not waiter.done():
+                replies[address[0]] = True
+                waiter.set_result(True)
+
+    def settle(key, waiter, expiry):
+        del waiters[key]
+        expiry.cancel()
+        window.release()
+
+    reading = False
+    try:
+        # Proactor loops (Windows) raise NotImplementedError here
+        loop.add_reader(sock.fileno(), on_readable)
+        reading = True
+        for index, ip in enumerate(ip_list):
+            replies[ip] = False
+            if index % SWEEP_YIELD_EVERY == 0:
+                await asyncio.sleep(0)
+            await window.acquire()
+            key = (ip, index & 0xFFFF)
+            waiter = waiters[key] = loop.create_future()
+            expiry = loop.call_later(timeout, _wake, waiter)
+            waiter.add_done_callback(functools.partial(settle, key, expiry=expiry))
+            try:
+                await _sendto(loop, sock, build_echo_request(ident, key[1]), (ip, 0))
+            except OSError as exc:
+                logging.debug(f"Error sending ICMP echo to {ip}: {exc}")
+                _wake(waiter)
+        if waiters:
+            await asyncio.wait(list(waiters.values()))
+    finally:
+        if reading:
+            loop.remove_reader(sock.fileno())
+        sock.close()
+        for waiter in list(waiters.values()):
+            waiter.cancel()
+
+    return replies
+
+
+def ping_sweep(ip_list, timeout=1):
+    """
+    Ping IPv4 addresses concurrently from a single ICMP socket.
+    Returns a dict mapping each IP to True if it replied within the timeout.
+    Raises OSError (or NotImplementedError on event loops without reader
+    support) when the sweep cannot run.
+    """
+    return asyncio.run(_sweep(ip_list, timeout))
+
+
+def build_syn_packet(src_ip, dst_ip, src_port, dst_port, seq):
+    """Build a TCP SYN segment (without IP header) with a valid checksum."""
+    segment = struct.pack(
+        "!HHIIBBHHH", src_port, dst_port, seq, 0, 5 << 4, TCP_SYN, 65535, 0, 0
+    )
+    pseudo_header = (
+        socket.inet_aton(src_ip)
+        + socket.inet_aton(dst_ip)
+        + struct.pack("!BBH", 0, socket.IPPROTO_TCP, len(segment))
+    )
+    checksum = internet_checksum(pseudo_header + segment)
+    return segment[:16] + struct.pack("!H", checksum) + segment[18:]
+
+
+def _source_address(dst_ip):
+    """Return the local IPv4 address the kernel would use to reach dst_ip."""
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as probe:
+        probe.connect((dst_ip, 9))
+        return probe.getsockname()[0]
+
+
+async def _syn_sweep(ip_list, ports, timeout):
+    """Send SYNs to every (ip, port) from one raw socket and collect the answers."""
+    loop = asyncio.get_running_loop()
+    sock = socket.socket(socket.AF_INET, socket.SOCK_RAW, socket.IPPROTO_TCP)
+    sock.setblocking(False)
+    # This socket also sees every other TCP segment on the host
+    _grow_receive_buffer(sock)
+    src_port = random.randint(32768, 60999)
+    seq = random.getrandbits(32)
+    expected_ack = (seq + 1) & 0xFFFFFFFF
+    targets = set(ip_list)
+    port_set = set(ports)
+    answers = {}
+    finished = loop.create_future()
+
+    def on_readable():
+        while True:
+            try:
+                packet = sock.recv(65535)
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError as exc:
+                logging.debug(f"Raw TCP receive error: {exc}")
+                return
+            # Raw sockets deliver the IP header as well
+            ihl = (packet[0] & 0x0F) * 4
+            if len(packet) < ihl + 20:
+                continue
+            sport, dport, _, ack, _, flags = struct.unpack(
+                "!HHIIBB", packet[ihl : ihl + 14]
+            )
+            if dport != src_port or ack != expected_ack or sport not in port_set:
+                continue
+            key = (socket.inet_ntoa(packet[12:16]), sport)
+            if key in answers or key[0] not in targets:
+                continue
+            if flags & (TCP_SYN | TCP_ACK) == TCP_SYN | TCP_ACK:
+                answers[key] = True
+            elif flags & TCP_RST:
+                answers[key] = False
+            else:
+                continue
+            if len(answers) == len(targets) * len(port_set):
+                _wake(finished)
+
+    reading = False
+    try:
+        src_ip = _source_address(ip_list[0])
+        loop.add_reader(sock.fileno(), on_readable)
+        reading = True
+        probes = itertools.product(ip_list, ports)
+        for index, (ip, port) in enumerate(probes):
+            if index % SWEEP_YIELD_EVERY == 0:
+                await asyncio.sleep(0)
+            packet = build_syn_packet(src_ip, ip, src_port, port, seq)
+            try:
+                await _sendto(loop, sock, packet, (ip, 0))
+            except OSError as exc:
+                logging.debug(f"Error sending SYN to {ip}:{port}: {exc}")
+        await asyncio.wait([finished], timeout=timeout)
+    finally:
+        if reading:
+            loop.remove_reader(sock.fileno())
+        sock.close()
+
+    return {key for key, is_open in answers.items() if is_open}
+
+
+def syn_scan(ip_list, ports, timeout=1):
+    """
+    Half-open (SYN) scan IPv4 addresses from a single raw socket.
+    The kernel answers SYN/ACKs with RST, so no connection is completed.
+    Returns the set of (ip, port) pairs that answered with SYN/ACK.
+    Requires root privileges.
+    """
+    if not ip_list or not ports:
+        return set()
+    return asyncio.run(_syn_sweep(ip_list, ports, timeout))
+
+
+def _tcp_socket(family):
+    """Create a non-blocking TCP socket, in a single syscall where supported."""
+    if SOCK_NONBLOCK:
+        return socket.socket(family, socket.SOCK_STREAM | SOCK_NONBLOCK)
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setblocking(False)
+    return sock
+
+
+def _wake(future):
+    if not future.done():
+        future.set_result(None)
+
+
+class _ProbeBatch:
+    """
+    Non-blocking connect_ex probes of one host that share one deadline.
+    Sockets are watched for writability by the event loop's selector and
+    classified with SO_ERROR; each open port sets its bit in mask.
+    """
+
+    def __init__(self, loop, ip):
+        self.loop = loop
+        self.ip = ip
+        self.family = socket.AF_INET6 if ":" in ip else socket.AF_INET
+        self.mask = 0
+        self.socks = []
+        self.waiting = {}
+        self.finished = loop.create_future()
+
+    def start(self, port, bit):
+        sock = _tcp_socket(self.family)
+        self.socks.append(sock)
+        # Numeric addresses never reach getaddrinfo
+        rc = sock.connect_ex((self.ip, port))
+        if rc in (errno.EINPROGRESS, errno.EWOULDBLOCK, errno.EAGAIN):
+            fd = sock.fileno()
+            self.waiting[fd] = bit, sock
+            self.loop.add_writer(fd, self._on_writable, fd)
+        elif rc == 0:
+            self.mask |= bit
+
+    def _on_writable(self, fd):
+        bit, sock = self.waiting.pop(fd)
+        self.loop.remove_writer(fd)
+        if sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR) == 0:
+            self.mask |= bit
+        if not self.waiting:
+            _wake(self.finished)
+
+    async def wait(self, timeout):
+        """Wait for the started probes until timeout and return the mask."""
+        if self.waiting:
+            await asyncio.wait([self.finished], timeout=timeout)
+        return self.mask
+
+    def close(self):
+        for fd in self.waiting:
+            self.loop.remove_writer(fd)
+        for sock in self.socks:
+            sock.close()
+
+
+async def _probe_batch(loop, ip, ports, timeout):
+    """Probe ports through one _ProbeBatch. Returns a mask, bit i for ports[i]."""
+    batch = _ProbeBatch(loop, ip)
+    try:
+        for col, port in enumerate(ports):
+            batch.start(port, 1 << col)
+        return await batch.wait(timeout)
+    finally:
+        batch.close()
+
+
+async def _probe_batch_proactor(loop, ip, ports, timeout):
+    """Probe ports with loop.sock_connect, for loops without add_writer (Windows)."""
+    family = socket.AF_INET6 if ":" in ip else socket.AF_INET
+
+    async def probe(port):
+        sock = _tcp_socket(family)
+        try:
+            await loop.sock_connect(sock, (ip, port))
+            return True
+        except OSError:
+            return False
+        finally:
+            sock.close()
+
+    probes = [loop.create_task(probe(port)) for port in ports]
+    done, pending = await asyncio.wait(probes, timeout=timeout)
+    for task in pending:
+        task.cancel()
+    if pending:
+        await asyncio.wait(pending)
+    return statuses_to_mask(task in done and task.result() for task in probes)
+
+
+async def scan_host(ip, ports=None, timeout=0.01, batch_size=MAX_IN_FLIGHT):
+    """
+    Scan a given IP for a list of ports.
+    Up to batch_size ports are probed at once and share a single timeout.
+    Returns an int with bit i set when ports[i] is open.
+    """
+    logging.debug(f"Scanning {ip} on ports {ports}")
+    loop = asyncio.get_running_loop()
+    if isinstance(loop, asyncio.SelectorEventLoop):
+        probe_batch = _probe_batch
+    else:
+        probe_batch = _probe_batch_proactor
+    mask = 0
+    for offset in range(0, len(ports), batch_size):
+        batch = ports[offset : offset + batch_size]
+        mask |= await probe_batch(loop, ip, batch, timeout) << offset
+    return mask
+
+
+_SCANNER_TEMPLATE = """\
+async def scan(ip, timeout):
+    batch = ProbeBatch(get_running_loop(), ip)
+    try:
+        start = batch.start
+{probes}
+        return await batch.wait(timeout)
+    finally:
+        batch.close()
+"""
+
+_PROBE_TEMPLATE = "        start({port:d}, {bit:#x})\n"
+
+
+def compile_scanner(ports):
+    """
+    Generate a scan(ip, timeout) coroutine specialized for ports.
+    The start of each probe is unrolled with its port number and mask bit
+    as constants; the probing itself is _ProbeBatch, as in _probe_batch.
+    Returns None when there are too many ports to unroll.
+    """
+    if not ports or len(ports) > SPECIALIZE_MAX_PORTS:
+        return None
+    probes = "".join(
+        _PROBE_TEMPLATE.format(port=int(port), bit=1 << col)
+        for col, port in enumerate(ports)
+    )
+    source = _SCANNER_TEMPLATE.format(probes=probes)
+    namespace = {
+        "get_running_loop": asyncio.get_running_loop,
+        "ProbeBatch": _ProbeBatch,
+    }
+    exec(compile(source, "<netscan-scanner>", "exec"), namespace)
+    return namespace["scan"]
+
+
+async def _scan_hosts(targets, ports, timeout, max_workers, on_batch, scanner=None):
+    """
+    Port scan (row, ip) targets from one event loop.
+    Finished hosts are handed to on_batch as (row, ip, mask) lists,
+    drained at most every PROGRESS_INTERVAL seconds. scanner, from
+    compile_scanner(ports), replaces scan_host when all ports fit one batch.
+    """
+    if hasattr(asyncio, "eager_task_factory"):
+        # Python 3.12+: start probes without a trip through the scheduler
+        asyncio.get_running_loop().set_task_factory(asyncio.eager_task_factory)
+    # Keep (hosts in flight) x (sockets per host) within the descriptor budget
+    socket_budget = min(MAX_IN_FLIGHT, _fd_budget() or MAX_IN_FLIGHT)
+    batch_size = max(1, min(len(ports), socket_budget))
+    hosts_in_flight = max(1, min(max_workers, socket_budget // batch_size))
+    host_limit = asyncio.Semaphore(hosts_in_flight)
+    loop = asyncio.get_running_loop()
+    if batch_size < len(ports) or not isinstance(loop, asyncio.SelectorEventLoop):
+        scanner = None
+
+    async def run(row, ip):
+        async with host_limit:
+            try:
+                if scanner is not None:
+                    return row, ip, await scanner(ip, timeout)
+                return row, ip, await scan_host(ip, ports, timeout, batch_size)
+            except Exception as e:
+                logging.warning(f"Error scanning {ip}: {e}")
+                return row, ip, 0
+
+    # Create host tasks in a sliding window so memory stays O(window), not O(hosts)
+    targets = iter(targets)
+    window = hosts_in_flight * SUBMIT_WINDOW_FACTOR
+    pending = set()
+    while True:
+        for row, ip in itertools.islice(targets, window - len(pending)):
+            pending.add(loop.create_task(run(row, ip)))
+        if not pending:
+            break
+        done, pending = await asyncio.wait(
+            pending, timeout=PROGRESS_INTERVAL, return_when=asyncio.FIRST_COMPLETED
+        )
+        if done:
+            on_batch([task.result() for task in done])
+
+
+def host_range(net):
+    """
+    Return the usable host addresses of a network as a range of integers.
+    Matches ipaddress hosts() without creating an address object per host.
+    """
+    first = int(net.network_address)
+    count = net.num_addresses
+    if count <= 2:
+        # /31, /32, /127 and /128 networks have no reserved addresses
+        return range(first, first + count)
+    if net.version == 4:
+        return range(first + 1, first + count - 1)
+    return range(first + 1, first + count)
+
+
+def format_ip(value, version=4):
+    """Format an integer address as a string."""
+    if version == 4:
+        return socket.inet_ntoa(struct.pack("!I", value))
+    return str(ipaddress.IPv6Address(value))
+
+
+def _fd_budget():
+    """Return how many descriptors can be spent on sockets, or None if unknown."""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    soft, _ = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft == resource.RLIM_INFINITY:
+        return None
+    # Leave room for stdio, log files, the event loop and the CSV output
+    return max(1, soft - 64)
+
+
+def _auto_workers(n_probes):
+    """Pick a default worker count from the probe count, CPUs and descriptor limit."""
+    cpus = os.cpu_count() or 1
+    workers = min(n_probes, max(32, cpus * 32), socket.SOMAXCONN // 2)
+    if platform.machine().lower() in ("armv7l", "aarch64") and cpus <= 4:
+        # Raspberry Pi class boards spend their time scheduling, not waiting
+        workers = min(workers, 32)
+    budget = _fd_budget()
+    if budget is not None:
+        workers = min(workers, budget)
+    return max(1, workers)
 
 
 def parse_ports(port_args):
@@ -141,108 +661,355 @@ def parse_ports(port_args):
     return sorted(ports)
 
 
-def sort_results(results):
-    """Sort scan results deterministically by IP and port."""
-    sorted_results = []
-    for ip, hostname, port_results in sorted(
-        results, key=lambda item: ipaddress.ip_address(item[0])
-    ):
-        sorted_port_results = sorted(
-            port_results,
-            key=lambda item: (-1 if item[0] is None else item[0]),
-        )
-        sorted_results.append((ip, hostname, sorted_port_results))
-    return sorted_results
+class ScanResults:
+    """
+    Scan results stored as parallel arrays with one row per host, in address order.
+    masks holds one integer per host with bit i set when ports[i] (or, in
+    ping mode, the host) is up.
+    """
+
+    def __init__(self, net, ports=None):
+        self.hosts = host_range(net)
+        self.version = net.version
+        # Ping mode has a single status column without a port number
+        self.ports = [None] if ports is None else list(ports)
+        self.hostnames = ["-"] * len(self.hosts)
+        if len(self.ports) <= MASK_BITS:
+            self.masks = array("Q", [0]) * len(self.hosts)
+        else:
+            self.masks = [0] * len(self.hosts)
+
+    def __len__(self):
+        return len(self.hosts)
+
+    def ip(self, row):
+        return format_ip(self.hosts[row], self.version)
+
+    def row_status(self, row):
+        mask = self.masks[row]
+        return [bool(mask >> col & 1) for col in range(len(self.ports))]
+
+    def port_results(self, row):
+        """Return the (port, up) pairs of one host."""
+        return list(zip(self.ports, self.row_status(row)))
+
+    def count_up(self):
+        """Count the (host, port) pairs that are up."""
+        return sum(bin(mask).count("1") for mask in self.masks if mask)
+
+    def entries(self, show_all=False):
+        """
+        Yield (ip, hostname, port_index, up) tuples, skipping down entries
+        unless show_all. port_index indexes self.ports and service_names().
+        """
+        width = len(self.ports)
+        for row, mask in enumerate(self.masks):
+            if show_all:
+                ip, hostname = self.ip(row), self.hostnames[row]
+                for col in range(width):
+                    yield ip, hostname, col, bool(mask >> col & 1)
+            elif mask:
+                ip, hostname = self.ip(row), self.hostnames[row]
+                for col in _set_bits(mask):
+                    yield ip, hostname, col, True
+
 
+def statuses_to_mask(statuses):
+    """Pack a sequence of up/down flags into an int, bit i for statuses[i]."""
+    mask = 0
+    for col, status in enumerate(statuses):
+        if status:
+            mask |= 1 << col
+    return mask
 
-def results_to_json_ready(results, show_all=False):
+
+def _set_bits(mask):
+    """Yield the indexes of the set bits of mask, lowest first."""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+def service_names(ports):
+    """
+    Look up the service name of each port once, indexed like ports.
+    ports=None (ping mode) gives the single unnamed status column.
+    """
+    if ports is None:
+        ports = [None]
+    return [COMMON_PORTS.get(port, "Unknown") for port in ports]
+
+
+def results_to_json_ready(results, show_all=False, services=None):
     """Convert scan results into a JSON-serializable structure."""
+    if services is None:
+        services = service_names(results.ports)
     payload = []
-    for ip, hostname, port_results in results:
+    for row in range(len(results)):
         ports = []
-        for port, status in port_results:
+        for port_idx, status in enumerate(results.row_status(row)):
             if not show_all and not status:
                 continue
             ports.append(
                 {
-                    "port": port,
-                    "service": COMMON_PORTS.get(port, "Unknown"),
+                    "port": results.ports[port_idx],
+                    "service": services[port_idx],
                     "up": status,
                     "status": "Up" if status else "Down",
                 }
             )
-        payload.append({"ip": ip, "hostname": hostname, "ports": ports})
+        payload.append(
+            {"ip": results.ip(row), "hostname": results.hostnames[row], "ports": ports}
+        )
     return payload
 
 
-def write_csv(results, output_csv):
-    """Write results to CSV."""
+def open_csv(output_csv):
+    """Open a CSV file for writing and emit the header. Returns (file, writer)."""
     folder_path = os.path.dirname(output_csv)
     if folder_path and not os.path.exists(folder_path):
         raise FileNotFoundError(f"The directory '{folder_path}' does not exist.")
 
-    with open(output_csv, mode="w", newline="") as csvfile:
-        csv_writer = csv.writer(csvfile)
-        csv_writer.writerow(["IP Address", "Hostname", "Port", "Service", "Status"])
-        for ip, hostname, port_results in results:
-            for port, status in port_results:
-                service = COMMON_PORTS.get(port, "Unknown")
-                csv_writer.writerow([ip, hostname, port, service, "Up" if status else "Down"])
+    csvfile = open(output_csv, mode="w", buffering=CSV_BUFFER_SIZE, newline="")
+    csv_writer = csv.writer(csvfile)
+    csv_writer.writerow(["IP Address", "Hostname", "Port", "Service", "Status"])
+    return csvfile, csv_writer
+
+
+def csv_rows(ip, hostname, port_results, services):
+    """Build the CSV rows of one host."""
+    return [
+        [ip, hostname, port, service, "Up" if status else "Down"]
+        for (port, status), service in zip(port_results, services)
+    ]
+
+
+def _csv_writer_loop(host_queue, csv_writer, services, errors):
+    """
+    Write queued (ip, hostname, port_results) hosts to CSV until None arrives.
+    Runs on a background thread; errors are appended to errors, and every
+    item is still consumed so the sentinel is always reached.
+    """
+    while True:
+        item = host_queue.get()
+        try:
+            if item is None:
+                return
+            if not errors:
+                csv_writer.writerows(csv_rows(*item, services))
+        except Exception as e:
+            errors.append(e)
+        finally:
+            host_queue.task_done()
+
+
+def write_csv(results, output_csv, services=None):
+    """Write results to CSV."""
+    if services is None:
+        services = service_names(results.ports)
+
+    csvfile, csv_writer = open_csv(output_csv)
+    with csvfile:
+        for row in range(len(results)):
+            csv_writer.writerows(
+                csv_rows(
+                    results.ip(row),
+                    results.hostnames[row],
+                    results.port_results(row),
+                    services,
+                )
+            )
+
+
+def _ping_rows(results, timeout, max_workers, on_batch):
+    """
+    Ping every host in results, handing (row, ip, is_up) lists to on_batch.
+    IPv4 uses ping_sweep; IPv6, or hosts without ICMP sockets, fall back to
+    the system ping command on a thread pool.
+    """
+    replies = None
+    if results.version == 4:
+        try:
+            replies = ping_sweep((format_ip(n) for n in results.hosts), timeout)
+        except (OSError, NotImplementedError) as e:
+            logging.debug(f"ICMP sweep unavailable, using system ping: {e}")
+
+    if replies is not None:
+        # Replies come back in the order the hosts were sent
+        on_batch([(row, *reply) for row, reply in enumerate(replies.items())])
+        return
+
+    rows = iter(range(len(results)))
+    window = max_workers * SUBMIT_WINDOW_FACTOR
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        in_flight = {}
+        while True:
+            for row in itertools.islice(rows, window - len(in_flight)):
+                ip = results.ip(row)
+                in_flight[executor.submit(ping_host, ip, timeout)] = row, ip
+            if not in_flight:
+                break
+            done, _ = wait(
+                in_flight, timeout=PROGRESS_INTERVAL, return_when=FIRST_COMPLETED
+            )
+            if done:
+                on_batch([(*in_flight.pop(future), future.result()) for future in done])
 
 
 def scan_network(
-    network_cidr, ports=None, timeout=0.5, max_workers=100, show_progress=True
+    net,
+    ports=None,
+    timeout=0.5,
+    max_workers=None,
+    show_progress=True,
+    resolve=False,
+    on_host=None,
+    syn=False,
+    ping_first=False,
+    scanner=None,
 ):
     """
-    Scan all hosts in a given CIDR network.
+    Scan all hosts in a network, given as an ipaddress network object or a
+    CIDR string.
     - If ports is None, it performs ICMP ping-only to detect live hosts.
-    - Otherwise, it scans the given TCP ports per host.
+      IPv4 sweeps use a single ICMP socket and fall back to the system
+      ping command when one cannot be opened.
+    - Otherwise, it scans the given TCP ports per host from a single
+      asyncio event loop, with max_workers hosts in flight at once
+      (derived by _auto_workers from the probe count when None).
+      With syn=True (root only, IPv4) a raw-socket SYN scan is used instead.
+      With ping_first=True only hosts that answer a ping sweep are scanned.
+      scanner, from compile_scanner(ports), is used in place of scan_host.
+    - If resolve is True, reverse DNS lookups for live hosts run on a
+      dedicated pool while the scan continues.
+    - If on_host is given, it is called as on_host(ip, hostname, port_results)
+      as soon as each host is complete, including its hostname.
+    Returns a ScanResults with one row per host.
     """
-    results = []
-    net = ipaddress.ip_network(network_cidr, strict=False)
-    ip_list = list(net.hosts())
-
-    progress_context = Progress() if show_progress else nullcontext()
-    with progress_context as progress:
-        task = progress.add_task("[cyan]Scanning...", total=len(ip_list)) if show_progress else None
-
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            if ports is None:
-                # ICMP ping-only mode
-                future_to_ip = {
-                    executor.submit(ping_host, str(ip), timeout): str(ip)
-                    for ip in ip_list
-                }
-                for future in as_completed(future_to_ip):
-                    ip = future_to_ip[future]
-                    is_up = future.result()
-                    hostname = resolve_hostname(ip) if is_up else "-"
-                    results.append((ip, hostname, [(None, is_up)]))
-                    if show_progress:
-                        progress.update(task, advance=1)
+    if isinstance(net, str):
+        net = ipaddress.ip_network(net, strict=False)
+    results = ScanResults(net, ports)
+    if max_workers is None:
+        max_workers = _auto_workers(len(results) * len(results.ports))
+    pending_names = {}
+
+    resolver_context = (
+        ThreadPoolExecutor(max_workers=RESOLVER_WORKERS) if resolve else nullcontext()
+    )
+    progress_context = (
+        Progress(refresh_per_second=10) if show_progress else nullcontext()
+    )
+    with resolver_context as resolver, progress_context as progress:
+        task = (
+            progress.add_task("[cyan]Scanning...", total=len(results))
+            if show_progress
+            else None
+        )
+
+        def emit(row):
+            if on_host is not None:
+                port_results = results.port_results(row)
+                on_host(results.ip(row), results.hostnames[row], port_results)
+
+        def record(row, ip, mask):
+            results.masks[row] = mask
+            if resolve and mask:
+                pending_names[row] = resolver.submit(resolve_hostname, ip)
+            else:
+                emit(row)
+
+        def collect_names(block=False):
+            for row, future in list(pending_names.items()):
+                if block or future.done():
+                    results.hostnames[row] = future.result()
+                    del pending_names[row]
+                    emit(row)
+
+        def advance(count):
+            if show_progress and count:
+                progress.update(task, advance=count)
+
+        if ports is None:
+            # ICMP ping-only mode
+            def on_ping_batch(batch):
+                for row, ip, is_up in batch:
+                    record(row, ip, int(is_up))
+                collect_names()
+                advance(len(batch))
+
+            _ping_rows(results, timeout, max_workers, on_ping_batch)
+        else:
+            rows = range(len(results))
+            if ping_first:
+                # Only hosts answering ping are port scanned
+                live_rows = []
+
+                def on_ping_batch(batch):
+                    for row, ip, is_up in batch:
+                        if is_up:
+                            live_rows.append(row)
+                        else:
+                            record(row, ip, 0)
+                    advance(len(batch) - sum(is_up for _, _, is_up in batch))
+
+                _ping_rows(results, timeout, max_workers, on_ping_batch)
+                rows = sorted(live_rows)
+
+            if syn:
+                # Half-open SYN scan mode
+                ip_list = [results.ip(row) for row in rows]
+                open_ports = syn_scan(ip_list, ports, timeout)
+                for row, ip in zip(rows, ip_list):
+                    mask = statuses_to_mask((ip, port) in open_ports for port in ports)
+                    record(row, ip, mask)
+                advance(len(ip_list))
             else:
                 # TCP port scan mode
-                future_to_ip = {
-                    executor.submit(scan_host, str(ip), ports, timeout): str(ip)
-                    for ip in ip_list
-                }
-                for future in as_completed(future_to_ip):
-                    ip = future_to_ip[future]
-                    try:
-                        port_results = future.result()
-                    except Exception as e:
-                        logging.warning(f"Error scanning {ip}: {e}")
-                        port_results = []
-                    hostname = resolve_hostname(ip)
-                    results.append((ip, hostname, port_results))
-                    if show_progress:
-                        progress.update(task, advance=1)
+                def on_batch(batch):
+                    for row, ip, mask in batch:
+                        record(row, ip, mask)
+                    collect_names()
+                    advance(len(batch))
+
+                asyncio.run(
+                    _scan_hosts(
+                        ((row, results.ip(row)) for row in rows),
+                        ports,
+                        timeout,
+                        max_workers,
+                        on_batch,
+                        scanner,
+                    )
+                )
+
+        collect_names(block=True)
 
     return results
 
 
-def display_results(results, show_all=False):
-    """Display scan results using a rich table."""
+def display_results(results, show_all=False, services=None, plain=False):
+    """
+    Display scan results using a rich table.
+    Large result sets, or plain=True, are written as tab-separated lines
+    instead, skipping Rich's per-row layout work.
+    """
+    if services is None:
+        services = service_names(results.ports)
+    ports = results.ports
+
+    n_rows = len(results) * len(ports) if show_all else results.count_up()
+    if plain or n_rows > PLAIN_OUTPUT_THRESHOLD:
+        rows = [
+            "\t".join(
+                (ip, hostname, str(ports[i]), services[i], "Up" if status else "Down")
+            )
+            for ip, hostname, i, status in results.entries(show_all=show_all)
+        ]
+        if rows:
+            sys.stdout.write("\n".join(rows) + "\n")
+        return
+
     table = Table(title="Scan Results")
     table.add_column("IP Address", style="bold")
     table.add_column("Hostname", style="cyan")
@@ -250,27 +1017,39 @@ def display_results(results, show_all=False):
     table.add_column("Service", style="yellow")
     table.add_column("Status", style="green")
 
-    for ip, hostname, port_results in results:
-        for port, status in port_results:
-            if not show_all and not status:
-                continue
-            service = COMMON_PORTS.get(port, "Unknown")
-            table.add_row(
-                ip, hostname, str(port), service, "🟢 Up" if status else "🔴 Down"
-            )
+    for ip, hostname, port_idx, status in results.entries(show_all=show_all):
+        table.add_row(
+            ip,
+            hostname,
+            str(ports[port_idx]),
+            services[port_idx],
+            "🟢 Up" if status else "🔴 Down",
+        )
 
     console.print(table)
 
 
+@functools.lru_cache(maxsize=4096)
 def resolve_hostname(ip):
-    """Try to resolve the hostname of an IP address."""
+    """Try to resolve the hostname of an IP address. Lookups are cached."""
     try:
         hostname, _, _ = socket.gethostbyaddr(ip)
         return hostname
-    except socket.herror:
+    except (socket.herror, socket.gaierror):
         return "-"
 
 
+def cached_gethostbyname(name, ttl=900):
+    """Resolve a hostname to IPv4, reusing answers younger than ttl seconds."""
+    now = time.monotonic()
+    cached = _forward_cache.get(name)
+    if cached is not None and now - cached[1] < ttl:
+        return cached[0]
+    ip = socket.gethostbyname(name)
+    _forward_cache[name] = (ip, now)
+    return ip
+
+
 def build_parser():
     parser = argparse.ArgumentParser(
         prog="netscan",
@@ -311,16 +1090,60 @@ def build_parser():
     parser.add_argument(
         "--output-csv", type=str, help="Path to output results in CSV format"
     )
+    parser.add_argument(
+        "--no-table",
+        action="store_true",
+        help="Do not print the results table (useful with --output-csv)",
+    )
+    parser.add_argument(
+        "--plain",
+        action="store_true",
+        help="Print results as tab-separated lines instead of a table. Used "
+        f"automatically above {PLAIN_OUTPUT_THRESHOLD} result rows",
+    )
     parser.add_argument(
         "--show-all",
         action="store_true",
         help="Show all results, including closed ports",
     )
+    parser.add_argument(
+        "--resolve",
+        dest="resolve",
+        action="store_true",
+        help="Resolve reverse DNS hostnames for live hosts",
+    )
+    parser.add_argument(
+        "--no-resolve",
+        dest="resolve",
+        action="store_false",
+        help="Skip reverse DNS hostname lookups",
+    )
+    parser.set_defaults(resolve=False)
+    parser.add_argument(
+        "--dns-ttl",
+        type=float,
+        default=900,
+        help="Seconds to reuse a resolved hostname argument within one process "
+        "(0 disables the cache)",
+    )
     parser.add_argument(
         "--workers",
+        "--max-workers",
+        dest="workers",
         type=int,
-        default=100,
-        help="Maximum number of concurrent host scan workers",
+        default=None,
+        help="Maximum number of concurrent host scan workers. When unset, derived "
+        "from the CPU count, probe count and open file limit",
+    )
+    parser.add_argument(
+        "--ping-first",
+        action="store_true",
+        help="Ping sweep the range first and only port scan hosts that reply",
+    )
+    parser.add_argument(
+        "--syn",
+        action="store_true",
+        help="Use a half-open SYN scan from a raw socket (root only, IPv4)",
     )
     parser.add_argument(
         "--json",
@@ -342,18 +1165,24 @@ def main(argv=None):
 
     logging.debug(f"Arguments: {args}")
 
+    # The TTL is needed before the network argument is resolved
+    if args.dns_ttl < 0:
+        console.print("[bold red]Error: DNS TTL must be zero or a positive number.[/bold red]")
+        return 1
+
     # Validate network or hostname argument
     try:
-        # Check if it's a valid IP network
-        ipaddress.ip_network(args.network, strict=False)
+        # Check if it's a valid IP network, keeping the parsed object for the scan
+        net = ipaddress.ip_network(args.network, strict=False)
     except ValueError:
         # If not, check if it's a valid hostname
         try:
-            resolved_ip = socket.gethostbyname(args.network)
+            resolved_ip = cached_gethostbyname(args.network, ttl=args.dns_ttl)
             console.print(
                 f"[bold blue]Resolved hostname '{args.network}' to IP '{resolved_ip}'[/bold blue]"
             )
             args.network = resolved_ip + "/32"  # Treat as a single-host network
+            net = ipaddress.ip_network(args.network)
         except socket.gaierror:
             console.print(
                 f"[bold red]Error: Invalid network range or hostname '{args.network}'[/bold red]"
@@ -370,15 +1199,53 @@ def main(argv=None):
     if args.timeout <= 0:
         console.print("[bold red]Error: Timeout must be a positive number.[/bold red]")
         return 1
-    if args.workers <= 0:
+    if args.workers is not None and args.workers <= 0:
         console.print("[bold red]Error: Workers must be a positive integer.[/bold red]")
         return 1
+    if args.syn:
+        if not args.common_ports and parsed_ports is None:
+            console.print("[bold red]Error: --syn requires ports to scan.[/bold red]")
+            return 1
+        if not hasattr(os, "geteuid") or os.geteuid() != 0:
+            console.print("[bold red]Error: --syn requires root privileges.[/bold red]")
+            return 1
+        if net.version != 4:
+            console.print("[bold red]Error: --syn only supports IPv4.[/bold red]")
+            return 1
 
     ports = (
-        list(COMMON_PORTS.keys())
+        sorted(COMMON_PORTS)
         if args.common_ports
         else parsed_ports
     )
+    if args.workers is None:
+        n_hosts = len(host_range(net))
+        args.workers = _auto_workers(n_hosts * (len(ports) if ports else 1))
+    services = service_names(ports)
+    # The port list is fixed from here on, so specialize the probe loop for it
+    scanner = compile_scanner(ports) if ports and not args.syn else None
+
+    # Hosts are queued to a background CSV writer as they complete
+    csv_file, on_host, csv_errors = None, None, []
+    if args.output_csv:
+        try:
+            csv_file, csv_writer = open_csv(args.output_csv)
+        except Exception as e:
+            console.print(f"[bold red]Error writing CSV: {e}[/bold red]")
+            return 1
+
+        csv_queue = queue.Queue()
+        csv_thread = threading.Thread(
+            target=_csv_writer_loop,
+            args=(csv_queue, csv_writer, services, csv_errors),
+            name="netscan-csv",
+            daemon=True,
+        )
+        csv_thread.start()
+
+        def on_host(ip, hostname, port_results):
+            csv_queue.put((ip, hostname, port_results))
+
     if not args.json and ports is None:
         console.print(
             f"[bold blue]Scanning {args.network} with ping (no ports specified) with timeout {args.timeout}s[/bold blue]"
@@ -390,44 +1257,65 @@ def main(argv=None):
 
     # Start scanning
     start = time.time()
-    results = sort_results(
-        scan_network(
-            args.network,
+    try:
+        results = scan_network(
+            net,
             ports=ports,
             timeout=args.timeout,
             max_workers=args.workers,
             show_progress=not args.json,
+            resolve=args.resolve,
+            on_host=on_host,
+            syn=args.syn,
+            ping_first=args.ping_first,
+            scanner=scanner,
         )
-    )
+    except OSError as e:
+        # Raw sockets can be refused even to root, e.g. without CAP_NET_RAW
+        if not args.syn:
+            raise
+        console.print(f"[bold red]Error: SYN scan failed: {e}[/bold red]")
+        return 1
+    finally:
+        if csv_file is not None:
+            csv_queue.put(None)
+            # Joining the thread, not the queue, cannot hang if the writer died
+            csv_thread.join()
+            if not csv_queue.empty() and not csv_errors:
+                csv_errors.append(RuntimeError("CSV writer stopped unexpectedly"))
+            try:
+                csv_file.close()
+            except Exception as e:
+                csv_errors.append(e)
     duration = time.time() - start
 
     if args.json:
         payload = {
             "network": args.network,
-            "mode": "ping" if ports is None else "tcp",
+            "mode": "ping" if ports is None else ("syn" if args.syn else "tcp"),
             "ports_requested": ports,
             "timeout": args.timeout,
             "workers": args.workers,
             "duration_seconds": round(duration, 4),
-            "results": results_to_json_ready(results, show_all=args.show_all),
+            "results": results_to_json_ready(
+                results, show_all=args.show_all, services=services
+            ),
         }
         console.print_json(data=payload)
     else:
         console.print(
             f"[bold green]Scan completed in {duration:.2f} seconds[/bold green]"
         )
-        display_results(results, show_all=args.show_all)
-
-    # If output CSV is specified, write results to CSV
-    if args.output_csv:
-        try:
-            write_csv(results, args.output_csv)
-        except Exception as e:
-            console.print(f"[bold red]Error writing CSV: {e}[/bold red]")
-            return 1
+        if not args.no_table:
+            display_results(
+                results, show_all=args.show_all, services=services, plain=args.plain
+            )
 
-        if not args.json:
-            console.print(f"[bold green]Results written to {args.output_csv}[/bold green]")
+    if csv_errors:
+        console.print(f"[bold red]Error writing CSV: {csv_errors[0]}[/bold red]")
+        return 1
+    if args.output_csv and not args.json:
+        console.print(f"[bold green]Results written to {args.output_csv}[/bold green]")
 
     return 0
 
@@ -1,8 +1,21 @@
+import asyncio
+import ipaddress
 import json
+import os
+import socket
+
+import pytest
 
 from netscan import cli
 
 
+def localhost_results():
+    results = cli.ScanResults(ipaddress.ip_network("127.0.0.1/32"), [22, 80])
+    results.masks[0] = 0b01
+    results.hostnames[0] = "localhost"
+    return results
+
+
 def test_parse_ports_supports_lists_ranges_and_dedupes():
     assert cli.parse_ports(["22", "80,443", "8000-8002", "443"]) == [
         22,
@@ -26,31 +39,48 @@ def test_parse_ports_rejects_invalid_range():
 def test_main_passes_workers_and_ports(monkeypatch):
     captured = {}
 
-    def fake_scan_network(network_cidr, ports=None, timeout=0.5, max_workers=100, show_progress=True):
-        captured["network"] = network_cidr
+    def fake_scan_network(
+        net,
+        ports=None,
+        timeout=0.5,
+        max_workers=100,
+        show_progress=True,
+        resolve=False,
+        on_host=None,
+        syn=False,
+        ping_first=False,
+        scanner=None,
+    ):
+        captured["network"] = net
         captured["ports"] = ports
         captured["timeout"] = timeout
         captured["max_workers"] = max_workers
         captured["show_progress"] = show_progress
-        return [("127.0.0.1", "localhost", [(22, True), (80, False)])]
+        captured["resolve"] = resolve
+        captured["on_host"] = on_host
+        captured["scanner"] = scanner
+        return localhost_results()
 
     monkeypatch.setattr(cli, "scan_network", fake_scan_network)
 
     exit_code = cli.main(["127.0.0.1/32", "-p", "22,80", "--workers", "12"])
 
     assert exit_code == 0
+    assert callable(captured.pop("scanner"))
     assert captured == {
-        "network": "127.0.0.1/32",
+        "network": ipaddress.ip_network("127.0.0.1/32"),
         "ports": [22, 80],
         "timeout": 0.5,
         "max_workers": 12,
         "show_progress": True,
+        "resolve": False,
+        "on_host": None,
     }
 
 
 def test_main_json_output(monkeypatch, capsys):
-    def fake_scan_network(network_cidr, ports=None, timeout=0.5, max_workers=100, show_progress=True):
-        return [("127.0.0.1", "localhost", [(22, True), (80, False)])]
+    def fake_scan_network(net, **kwargs):
+        return localhost_results()
 
     monkeypatch.setattr(cli, "scan_network", fake_scan_network)
 
@@ -77,3 +107,486 @@ def test_main_json_output(monkeypatch, capsys):
 
 def test_main_rejects_invalid_workers():
     assert cli.main(["127.0.0.1/32", "--workers", "0"]) == 1
+
+
+def test_main_rejects_negative_dns_ttl(monkeypatch):
+    def fail_lookup(name, ttl=900):
+        raise AssertionError("hostname resolved despite an invalid TTL")
+
+    monkeypatch.setattr(cli, "cached_gethostbyname", fail_lookup)
+
+    assert cli.main(["example.invalid", "--dns-ttl", "-1"]) == 1
+
+
+def test_build_echo_request_has_valid_checksum():
+    packet = cli.build_echo_request(0x1234, 7)
+
+    assert packet[0] == cli.ICMP_ECHO_REQUEST
+    assert cli.internet_checksum(packet) == 0
+
+
+def loopback_hosts(prefix):
+    return [str(ip) for ip in ipaddress.ip_network(prefix).hosts()]
+
+
+def test_ping_sweep_keeps_replies_beyond_one_receive_buffer():
+    try:
+        cli.open_icmp_socket()[0].close()
+    except OSError:
+        pytest.skip("ICMP sockets are not available")
+    hosts = loopback_hosts("127.0.0.0/21")
+
+    replies = cli.ping_sweep(hosts, timeout=1)
+
+    assert list(replies) == hosts
+    assert all(replies.values())
+
+
+def test_ping_sweep_closes_socket_without_reader_support(monkeypatch):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+    def no_readers(self, fd, callback, *args):
+        raise NotImplementedError
+
+    monkeypatch.setattr(cli, "open_icmp_socket", lambda: (sock, False))
+    monkeypatch.setattr(
+        asyncio.selector_events.BaseSelectorEventLoop, "add_reader", no_readers
+    )
+
+    with pytest.raises(NotImplementedError):
+        cli.ping_sweep(["127.0.0.1"])
+    assert sock.fileno() == -1
+
+
+def test_scan_network_falls_back_to_system_ping(monkeypatch):
+    def unavailable_sweep(ip_list, timeout=1):
+        raise PermissionError("raw sockets require privileges")
+
+    monkeypatch.setattr(cli, "ping_sweep", unavailable_sweep)
+    monkeypatch.setattr(cli, "ping_host", lambda ip, timeout=1: ip == "10.0.0.1")
+    monkeypatch.setattr(cli, "resolve_hostname", lambda ip: "gateway")
+
+    results = cli.scan_network(
+        "10.0.0.0/30", timeout=0.1, show_progress=False, resolve=True
+    )
+
+    assert list(results.entries(show_all=True)) == [
+        ("10.0.0.1", "gateway", 0, True),
+        ("10.0.0.2", "-", 0, False),
+    ]
+
+
+def test_scan_network_skips_reverse_dns_by_default(monkeypatch):
+    def unexpected_lookup(ip):
+        raise AssertionError("reverse DNS should not run without resolve=True")
+
+    async def fake_scan_host(ip, ports, timeout, batch_size=None):
+        return 0b1
+
+    monkeypatch.setattr(cli, "scan_host", fake_scan_host)
+    monkeypatch.setattr(cli, "resolve_hostname", unexpected_lookup)
+
+    results = cli.scan_network("10.0.0.1/32", ports=[22], show_progress=False)
+
+    assert list(results.entries()) == [("10.0.0.1", "-", 0, True)]
+
+
+def test_main_resolve_flag(monkeypatch):
+    captured = {}
+
+    def fake_scan_network(net, **kwargs):
+        captured.update(kwargs)
+        return localhost_results()
+
+    monkeypatch.setattr(cli, "scan_network", fake_scan_network)
+
+    assert cli.main(["127.0.0.1/32", "-p", "22", "--resolve"]) == 0
+    assert captured["resolve"] is True
+
+
+def test_scan_host_detects_open_and_closed_ports():
+    listener = socket.socket()
+    listener.bind(("127.0.0.1", 0))
+    listener.listen()
+    closed = socket.socket()
+    closed.bind(("127.0.0.1", 0))
+    open_port = listener.getsockname()[1]
+    closed_port = closed.getsockname()[1]
+    closed.close()
+
+    try:
+        results = asyncio.run(
+            cli.scan_host("127.0.0.1", [open_port, closed_port], timeout=1)
+        )
+    finally:
+        listener.close()
+
+    assert results == 0b01
+
+
+def test_tcp_socket_is_non_blocking():
+    sock = cli._tcp_socket(socket.AF_INET)
+    try:
+        assert sock.gettimeout() == 0.0
+        assert sock.type == socket.SOCK_STREAM
+    finally:
+        sock.close()
+
+
+def test_auto_workers_caps_small_arm_boards(monkeypatch):
+    monkeypatch.setattr(cli.os, "cpu_count", lambda: 4)
+    monkeypatch.setattr(cli, "_fd_budget", lambda: None)
+
+    monkeypatch.setattr(cli.platform, "machine", lambda: "armv7l")
+    assert cli._auto_workers(10_000) == 32
+
+    monkeypatch.setattr(cli.platform, "machine", lambda: "x86_64")
+    assert cli._auto_workers(10_000) == min(128, cli.socket.SOMAXCONN // 2)
+    assert cli._auto_workers(5) == 5
+
+
+def test_auto_workers_respects_descriptor_budget(monkeypatch):
+    monkeypatch.setattr(cli.os, "cpu_count", lambda: 64)
+    monkeypatch.setattr(cli, "_fd_budget", lambda: 20)
+
+    assert cli._auto_workers(10_000) == 20
+
+
+def test_main_derives_workers_when_unset(monkeypatch):
+    captured = {}
+
+    def fake_scan_network(net, **kwargs):
+        captured.update(kwargs)
+        return localhost_results()
+
+    monkeypatch.setattr(cli, "scan_network", fake_scan_network)
+    monkeypatch.setattr(cli, "_auto_workers", lambda n_probes: n_probes + 1)
+
+    assert cli.main(["127.0.0.0/30", "-p", "22,80"]) == 0
+    # 127.0.0.0/30 has two usable hosts
+    assert captured["max_workers"] == 2 * 2 + 1
+
+
+def test_scan_network_derives_workers_when_unset(monkeypatch):
+    captured = {}
+
+    async def fake_scan_hosts(targets, ports, timeout, max_workers, *args):
+        captured["max_workers"] = max_workers
+
+    monkeypatch.setattr(cli, "_scan_hosts", fake_scan_hosts)
+    monkeypatch.setattr(cli, "_auto_workers", lambda n_probes: n_probes + 1)
+
+    cli.scan_network("10.0.0.0/29", ports=[22, 80, 443], show_progress=False)
+
+    assert captured["max_workers"] == 6 * 3 + 1
+
+
+def test_host_range_matches_ipaddress_hosts():
+    for cidr in ["10.0.0.0/24", "10.0.0.0/31", "10.0.0.7/32", "fd00::/124", "fd00::1/128"]:
+        net = ipaddress.ip_network(cidr)
+        expected = [str(ip) for ip in net.hosts()]
+
+        assert [cli.format_ip(n, net.version) for n in cli.host_range(net)] == expected
+
+
+def test_scan_results_entries_skip_down_ports():
+    results = cli.ScanResults(ipaddress.ip_network("10.0.0.0/30"), [22, 80, 443])
+    results.masks[0] = 0b010
+    results.masks[1] = 0b101
+
+    assert list(results.entries()) == [
+        ("10.0.0.1", "-", 1, True),
+        ("10.0.0.2", "-", 0, True),
+        ("10.0.0.2", "-", 2, True),
+    ]
+    assert len(list(results.entries(show_all=True))) == 6
+    assert results.count_up() == 3
+
+
+def test_scan_results_store_wide_masks():
+    ports = list(range(1, 101))
+    results = cli.ScanResults(ipaddress.ip_network("10.0.0.0/30"), ports)
+    results.masks[1] = 1 << 99
+
+    assert list(results.entries()) == [("10.0.0.2", "-", 99, True)]
+    assert results.port_results(1)[-1] == (100, True)
+
+
+def test_write_csv_uses_precomputed_services(tmp_path):
+    output = tmp_path / "results.csv"
+
+    cli.write_csv(localhost_results(), str(output), services=["Custom", "Web"])
+
+    assert output.read_text().splitlines() == [
+        "IP Address,Hostname,Port,Service,Status",
+        "127.0.0.1,localhost,22,Custom,Up",
+        "127.0.0.1,localhost,80,Web,Down",
+    ]
+
+
+def test_main_streams_csv_rows_as_hosts_complete(monkeypatch, tmp_path):
+    output = tmp_path / "results.csv"
+
+    def fake_scan_network(net, on_host=None, **kwargs):
+        on_host("127.0.0.1", "localhost", [(22, True), (80, False)])
+        return localhost_results()
+
+    monkeypatch.setattr(cli, "scan_network", fake_scan_network)
+
+    assert cli.main(["127.0.0.1/32", "-p", "22,80", "--output-csv", str(output)]) == 0
+    assert output.read_text().splitlines() == [
+        "IP Address,Hostname,Port,Service,Status",
+        "127.0.0.1,localhost,22,SSH,Up",
+        "127.0.0.1,localhost,80,HTTP,Down",
+    ]
+
+
+def test_cached_gethostbyname_reuses_answers_until_ttl(monkeypatch):
+    lookups = []
+    clock = [1000.0]
+
+    def fake_gethostbyname(name):
+        lookups.append(name)
+        return "192.0.2.10"
+
+    monkeypatch.setattr(cli.socket, "gethostbyname", fake_gethostbyname)
+    monkeypatch.setattr(cli.time, "monotonic", lambda: clock[0])
+    monkeypatch.setattr(cli, "_forward_cache", {})
+
+    assert cli.cached_gethostbyname("printer.lan", ttl=60) == "192.0.2.10"
+    clock[0] += 30
+    assert cli.cached_gethostbyname("printer.lan", ttl=60) == "192.0.2.10"
+    assert lookups == ["printer.lan"]
+
+    clock[0] += 31
+    cli.cached_gethostbyname("printer.lan", ttl=60)
+    assert lookups == ["printer.lan", "printer.lan"]
+
+
+def test_display_results_plain_output(capsys):
+    cli.display_results(localhost_results(), show_all=True, plain=True)
+
+    assert capsys.readouterr().out.splitlines() == [
+        "127.0.0.1\tlocalhost\t22\tSSH\tUp",
+        "127.0.0.1\tlocalhost\t80\tHTTP\tDown",
+    ]
+
+
+def test_scan_host_batches_share_one_deadline():
+    listener = socket.socket()
+    listener.bind(("127.0.0.1", 0))
+    listener.listen()
+    open_port = listener.getsockname()[1]
+
+    try:
+        results = asyncio.run(
+            cli.scan_host("127.0.0.1", [open_port, 1, open_port], 1, batch_size=2)
+        )
+    finally:
+        listener.close()
+
+    assert results == 0b101
+
+
+def test_compiled_scanner_matches_scan_host():
+    listeners = []
+    for _ in range(2):
+        listener = socket.socket()
+        listener.bind(("127.0.0.1", 0))
+        listener.listen()
+        listeners.append(listener)
+    first, second = [listener.getsockname()[1] for listener in listeners]
+    ports = [1, first, 2, second, first, 3]
+    scanner = cli.compile_scanner(ports)
+
+    async def scan_all():
+        return (
+            await scanner("127.0.0.1", 1),
+            await cli.scan_host("127.0.0.1", ports, 1),
+            await cli.scan_host("127.0.0.1", ports, 1, batch_size=4),
+        )
+
+    try:
+        masks = asyncio.run(scan_all())
+    finally:
+        for listener in listeners:
+            listener.close()
+
+    assert masks == (0b011010,) * 3
+    assert cli.compile_scanner(list(range(1, cli.SPECIALIZE_MAX_PORTS + 2))) is None
+
+
+def test_build_syn_packet_has_valid_checksum():
+    segment = cli.build_syn_packet("192.0.2.1", "192.0.2.2", 40000, 443, 12345)
+    pseudo_header = (
+        socket.inet_aton("192.0.2.1")
+        + socket.inet_aton("192.0.2.2")
+        + bytes([0, socket.IPPROTO_TCP, 0, len(segment)])
+    )
+
+    assert len(segment) == 20
+    assert segment[13] == cli.TCP_SYN
+    assert cli.internet_checksum(pseudo_header + segment) == 0
+
+
+@pytest.mark.skipif(
+    not hasattr(os, "geteuid") or os.geteuid() != 0, reason="SYN scans need root"
+)
+def test_syn_scan_keeps_answers_beyond_one_receive_buffer():
+    listeners = []
+    for _ in range(5):
+        listener = socket.socket()
+        listener.bind(("0.0.0.0", 0))
+        listener.listen()
+        listeners.append(listener)
+    open_ports = [listener.getsockname()[1] for listener in listeners]
+    hosts = loopback_hosts("127.0.0.0/25")
+
+    try:
+        found = cli.syn_scan(hosts, open_ports + list(range(1, 11)), timeout=1)
+    finally:
+        for listener in listeners:
+            listener.close()
+
+    assert found == {(ip, port) for ip in hosts for port in open_ports}
+
+
+def test_main_rejects_syn_without_root(monkeypatch):
+    monkeypatch.setattr(cli.os, "geteuid", lambda: 1000, raising=False)
+
+    assert cli.main(["127.0.0.1/32", "-p", "22", "--syn"]) == 1
+
+
+def test_main_reports_refused_raw_socket(monkeypatch):
+    real_socket = socket.socket
+
+    def no_raw_sockets(family=-1, type=-1, proto=-1, fileno=None):
+        if type == socket.SOCK_RAW:
+            raise PermissionError(1, "Operation not permitted")
+        return real_socket(family, type, proto, fileno)
+
+    monkeypatch.setattr(cli.os, "geteuid", lambda: 0, raising=False)
+    monkeypatch.setattr(cli.socket, "socket", no_raw_sockets)
+
+    assert cli.main(["127.0.0.1/32", "-p", "80", "--syn", "--json"]) == 1
+
+
+def test_ping_host_builds_command_from_platform_flags(monkeypatch):
+    calls = []
+
+    class Completed:
+        returncode = 0
+
+    def fake_run(command, **kwargs):
+        calls.append(command)
+        return Completed()
+
+    monkeypatch.setattr(cli.subprocess, "run", fake_run)
+    monkeypatch.setattr(cli, "_IS_WINDOWS", False)
+
+    assert cli.ping_host("10.0.0.1", timeout=2) is True
+    assert calls == [["ping", cli._PING_COUNT_FLAG, "1", cli._PING_TIMEOUT_FLAG, "2", "10.0.0.1"]]
+
+
+def test_scan_network_ping_first_only_scans_live_hosts(monkeypatch):
+    scanned = []
+
+    async def fake_scan_host(ip, ports, timeout, batch_size=None):
+        scanned.append(ip)
+        return (1 << len(ports)) - 1
+
+    monkeypatch.setattr(
+        cli, "ping_sweep", lambda ips, timeout=1: {ip: ip == "10.0.0.2" for ip in ips}
+    )
+    monkeypatch.setattr(cli, "scan_host", fake_scan_host)
+
+    results = cli.scan_network(
+        "10.0.0.0/29", ports=[22, 80], show_progress=False, ping_first=True
+    )
+
+    assert scanned == ["10.0.0.2"]
+    assert list(results.entries()) == [
+        ("10.0.0.2", "-", 0, True),
+        ("10.0.0.2", "-", 1, True),
+    ]
+    assert len(list(results.entries(show_all=True))) == 12
+
+
+def test_scan_network_ping_first_scans_every_live_loopback_host(monkeypatch):
+    try:
+        cli.open_icmp_socket()[0].close()
+    except OSError:
+        pytest.skip("ICMP sockets are not available")
+    scanned = []
+
+    async def fake_scan_host(ip, ports, timeout, batch_size=None):
+        scanned.append(ip)
+        return 0b1
+
+    monkeypatch.setattr(cli, "scan_host", fake_scan_host)
+
+    results = cli.scan_network(
+        "127.0.0.0/22", ports=[22], timeout=1, show_progress=False, ping_first=True
+    )
+
+    assert sorted(scanned) == sorted(loopback_hosts("127.0.0.0/22"))
+    assert results.count_up() == len(results)
+
+
+def test_scan_hosts_submits_in_a_bounded_window(monkeypatch):
+    consumed = []
+    consumed_at_first_batch = []
+
+    def targets():
+        for row in range(100):
+            consumed.append(row)
+            yield row, f"10.0.0.{row}"
+
+    async def fake_scan_host(ip, ports, timeout, batch_size=None):
+        await asyncio.sleep(0)
+        return 0
+
+    def on_batch(batch):
+        if not consumed_at_first_batch:
+            consumed_at_first_batch.append(len(consumed))
+
+    monkeypatch.setattr(cli, "scan_host", fake_scan_host)
+
+    asyncio.run(cli._scan_hosts(targets(), [22], 0.1, 1, on_batch))
+
+    assert consumed_at_first_batch[0] <= cli.SUBMIT_WINDOW_FACTOR
+    assert len(consumed) == 100
+
+
+def test_csv_writer_loop_collects_write_errors():
+    class FullDisk:
+        def writerows(self, rows):
+            raise OSError("No space left on device")
+
+    host_queue = cli.queue.Queue()
+    errors = []
+    host_queue.put(("127.0.0.1", "-", [(22, True)]))
+    host_queue.put(("127.0.0.2", "-", [(22, False)]))
+    host_queue.put(None)
+
+    cli._csv_writer_loop(host_queue, FullDisk(), ["SSH"], errors)
+
+    assert [str(e) for e in errors] == ["No space left on device"]
+    assert host_queue.unfinished_tasks == 0
+
+
+def test_csv_writer_loop_survives_non_os_errors():
+    class AsciiOnly:
+        def writerows(self, rows):
+            "".join(str(field) for row in rows for field in row).encode("ascii")
+
+    host_queue = cli.queue.Queue()
+    errors = []
+    host_queue.put(("127.0.0.1", "café.lan", [(22, True)]))
+    host_queue.put(("127.0.0.2", "-", [(22, False)]))
+    host_queue.put(None)
+
+    cli._csv_writer_loop(host_queue, AsciiOnly(), ["SSH"], errors)
+
+    assert [type(e) for e in errors] == [UnicodeEncodeError]
+    assert host_queue.unfinished_tasks == 0